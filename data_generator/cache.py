@@ -0,0 +1,55 @@
+# developer: Taoshidev
+# Copyright © 2023 Taoshi Inc
+
+import hashlib
+
+import orjson
+
+from time_util.time_util import TimeUtil
+from vali_config import ValiConfig
+from vali_objects.utils.vali_bkp_utils import ValiBkpUtils
+
+
+class FileCache:
+    def __init__(self, cache_dir: str):
+        self._cache_dir = cache_dir
+        self.hits = 0
+        self.empty_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*args) -> str:
+        return hashlib.md5("|".join([str(arg) for arg in args]).encode()).hexdigest()
+
+    @staticmethod
+    def get_cache_filename(key: str) -> str:
+        return key + ".json"
+
+    def get(self, key: str):
+        try:
+            entry = orjson.loads(ValiBkpUtils.get_vali_file(self._cache_dir + FileCache.get_cache_filename(key)))
+        except (FileNotFoundError, ValueError):
+            # missing or partially written entries are treated as a miss
+            self.misses += 1
+            return None
+        if entry["expires"] is not None and entry["expires"] < TimeUtil.now_in_millis():
+            self.misses += 1
+            return None
+        self.hits += 1
+        if len(entry["value"]) == 0:
+            self.empty_hits += 1
+        return entry["value"]
+
+    def set(self, key: str, value, ttl_ms: int = None) -> None:
+        entry = {
+            "expires": TimeUtil.now_in_millis() + ttl_ms if ttl_ms is not None else None,
+            "value": value
+        }
+        ValiBkpUtils.write_vali_file(self._cache_dir, FileCache.get_cache_filename(key), entry)
+
+    def delete_stale(self) -> None:
+        ValiBkpUtils.delete_stale_files(self._cache_dir, ValiConfig.DATA_CACHE_STALE_DAYS)
+
+
+# historical candles don't change once closed so they're shared across generators & requests
+data_cache = FileCache(ValiBkpUtils.get_data_cache_dir())
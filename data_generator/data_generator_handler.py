@@ -1,37 +1,83 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+import aiohttp
+
 from data_generator.financial_markets_generator.binance_data import BinanceData
 from data_generator.financial_markets_generator.bybit_data import ByBitData
+from vali_config import ValiConfig
 from vali_objects.exceptions.incorrect_live_results_count_exception import IncorrectLiveResultsCountException
 
 
 class DataGeneratorHandler:
 
+    @staticmethod
+    def _get_financial_markets_args(args):
+        args = args[0]
+        # symbol, tf, ds, ts_range
+        return args[0]["trade_pair"], args[0]["tf"], args[1], args[2]
+
+    @staticmethod
+    def _check_expected_length(ds: List[List], attempt_ds: List[List], expected_length: int):
+        results_length = len(ds[0]) + len(attempt_ds[0])
+        if expected_length != 0 and results_length != expected_length:
+            raise IncorrectLiveResultsCountException(f"not expected length for results [{results_length}], "
+                                                     f"expected [{expected_length}]")
+
+    @staticmethod
+    def _merge_ds(ds: List[List], attempt_ds: List[List]):
+        for i, dp in enumerate(attempt_ds):
+            ds[i].extend(dp)
+
+    @staticmethod
+    def _next_exchange(e: Exception, exchange_list_order: List, exchange_list_order_ind: int) -> int:
+        exchange_list_order_ind += 1
+        if exchange_list_order_ind > len(exchange_list_order)-1:
+            if isinstance(e, IncorrectLiveResultsCountException):
+                raise e
+            else:
+                raise Exception("could not get financial markets data from available exchanges, make sure you "
+                                "are not in a restricted region and have network connectivity.")
+        print("trying next exchange", exchange_list_order[exchange_list_order_ind])
+        return exchange_list_order_ind
+
     def _get_financial_markets_data(self, exchange_list_order_ind: int = 0, expected_length: int = 0, *args):
         exchange_list_order = [BinanceData()]
+        symbol, tf, ds, ts_range = self._get_financial_markets_args(args)
 
-        try:
-            args = args[0]
-
-            symbol = args[0]["trade_pair"]
-            tf = args[0]["tf"]
-            ds = args[1]
-            ts_range = args[2]
-
-            exchange_list_order[exchange_list_order_ind]\
-                .get_data_and_structure_data_points(symbol=symbol, tf=tf,  data_structure=ds, ts_range=ts_range)
-            if expected_length != 0 and len(ds[0]) != expected_length:
-                raise IncorrectLiveResultsCountException(f"not expected length for results [{len(ds[0])}], "
-                                f"expected [{expected_length}]")
-        except Exception as e:
-            exchange_list_order_ind += 1
-            if exchange_list_order_ind > len(exchange_list_order)-1:
-                if isinstance(e, IncorrectLiveResultsCountException):
-                    raise e
-                else:
-                    raise Exception("could not get financial markets data from available exchanges, make sure you "
-                                    "are not in a restricted region and have network connectivity.")
-            else:
-                print("trying next exchange", exchange_list_order[exchange_list_order_ind])
-                self._get_financial_markets_data(exchange_list_order_ind, expected_length, args)
+        while True:
+            # each attempt is collected on its own so a failed exchange leaves no partial rows in ds,
+            # which callers may share across ranges
+            attempt_ds = [[] for _ in ds]
+            try:
+                exchange_list_order[exchange_list_order_ind]\
+                    .get_data_and_structure_data_points(symbol=symbol, tf=tf, data_structure=attempt_ds,
+                                                        ts_range=ts_range)
+                self._check_expected_length(ds, attempt_ds, expected_length)
+                self._merge_ds(ds, attempt_ds)
+                return
+            except Exception as e:
+                exchange_list_order_ind = self._next_exchange(e, exchange_list_order, exchange_list_order_ind)
+
+    async def _get_financial_markets_data_async(self,
+                                                session: aiohttp.ClientSession,
+                                                exchange_list_order_ind: int = 0,
+                                                expected_length: int = 0,
+                                                *args):
+        exchange_list_order = [BinanceData()]
+        symbol, tf, ds, ts_range = self._get_financial_markets_args(args)
+
+        while True:
+            attempt_ds = [[] for _ in ds]
+            try:
+                await exchange_list_order[exchange_list_order_ind]\
+                    .get_data_and_structure_data_points_async(session, symbol=symbol, tf=tf,
+                                                              data_structure=attempt_ds, ts_range=ts_range)
+                self._check_expected_length(ds, attempt_ds, expected_length)
+                self._merge_ds(ds, attempt_ds)
+                return
+            except Exception as e:
+                exchange_list_order_ind = self._next_exchange(e, exchange_list_order, exchange_list_order_ind)
 
     def data_generator_handler(self, topic_id: int, expected_length: int = 0, *args):
         topic_method_map = {
@@ -39,4 +85,41 @@ class DataGeneratorHandler:
         }
         return topic_method_map[topic_id](0, expected_length, args)
 
+    async def data_generator_handler_async(self,
+                                           session: aiohttp.ClientSession,
+                                           topic_id: int,
+                                           expected_length: int = 0,
+                                           *args):
+        topic_method_map = {
+            1: self._get_financial_markets_data_async
+        }
+        return await topic_method_map[topic_id](session, 0, expected_length, args)
 
+    async def data_generator_handler_ranges_async(self,
+                                                  topic_id: int,
+                                                  additional_details: Dict,
+                                                  ds: List[List],
+                                                  ts_ranges: List[Tuple[int, int]]):
+        # each range is gathered into its own data structure so results can be
+        # merged back into ds in ts_ranges order regardless of completion order
+        ranges_ds = [[[] for _ in ds] for _ in ts_ranges]
+        # same connect / read limits as the sync requests path rather than aiohttp's 5 minute default
+        timeout = aiohttp.ClientTimeout(sock_connect=ValiConfig.DATA_REQUEST_CONNECT_TIMEOUT,
+                                        sock_read=ValiConfig.DATA_REQUEST_READ_TIMEOUT)
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=64),
+                                         timeout=timeout) as session:
+            # a failing range cancels the others so none are left running against the closed session
+            try:
+                async with asyncio.TaskGroup() as task_group:
+                    for range_ds, ts_range in zip(ranges_ds, ts_ranges):
+                        task_group.create_task(self.data_generator_handler_async(session,
+                                                                                 topic_id,
+                                                                                 0,
+                                                                                 additional_details,
+                                                                                 range_ds,
+                                                                                 ts_range))
+            except ExceptionGroup as eg:
+                # callers handle the exchange exceptions themselves rather than an exception group
+                raise eg.exceptions[0]
+        for range_ds in ranges_ds:
+            self._merge_ds(ds, range_ds)
@@ -1,5 +1,21 @@
+import asyncio
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from data_generator.cache import data_cache, FileCache
+from time_util.time_util import TimeUtil
+from vali_config import ValiConfig
+
+
+# reused across requests so each ts range doesn't pay for a new tcp + tls handshake
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0))
 
 
 class BaseFinancialMarketsGenerator(ABC):
@@ -11,9 +27,100 @@ class BaseFinancialMarketsGenerator(ABC):
         pass
 
     @abstractmethod
-    def get_data_and_structure_data_points(self, *args):
+    async def get_data_async(self, session: aiohttp.ClientSession, *args):
         pass
 
+    def get_data_and_structure_data_points(self,
+                                           symbol: str,
+                                           tf: int,
+                                           data_structure: List[List],
+                                           ts_range: Tuple[int, int]):
+        data = self.get_cached_data(symbol, tf, ts_range)
+        if data is None:
+            data = self.get_data(symbol=symbol, interval=tf, start=ts_range[0], end=ts_range[1])
+            self.set_cached_data(symbol, tf, ts_range, data)
+        self.convert_output_to_data_points(data_structure, data, self._order_to_ds)
+
+    async def get_data_and_structure_data_points_async(self,
+                                                       session: aiohttp.ClientSession,
+                                                       symbol: str,
+                                                       tf: int,
+                                                       data_structure: List[List],
+                                                       ts_range: Tuple[int, int]):
+        data = self.get_cached_data(symbol, tf, ts_range)
+        if data is None:
+            data = await self.get_data_async(session, symbol=symbol, interval=tf, start=ts_range[0], end=ts_range[1])
+            self.set_cached_data(symbol, tf, ts_range, data)
+        self.convert_output_to_data_points(data_structure, data, self._order_to_ds)
+
+    def request_data(self, url: str, params: Dict) -> bytes:
+        for attempt in range(ValiConfig.DATA_REQUEST_RETRIES):
+            try:
+                response = _SESSION.get(url,
+                                        params=params,
+                                        timeout=(ValiConfig.DATA_REQUEST_CONNECT_TIMEOUT,
+                                                 ValiConfig.DATA_REQUEST_READ_TIMEOUT))
+            except requests.RequestException:
+                response = None
+
+            if response is not None:
+                if response.status_code == 200:
+                    return response.content
+                elif not self.is_retryable_status(response.status_code):
+                    raise ConnectionError(f"received error status code [{response.status_code}] "
+                                          f"from [{self.__class__.__name__}]")
+            if not self.is_last_attempt(attempt):
+                time.sleep(self.get_retry_delay(attempt))
+        raise ConnectionError(f"max number of retries exceeded trying to get [{self.__class__.__name__}] data")
+
+    async def request_data_async(self, session: aiohttp.ClientSession, url: str, params: Dict) -> bytes:
+        for attempt in range(ValiConfig.DATA_REQUEST_RETRIES):
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status == 200:
+                        return await response.read()
+                    elif not self.is_retryable_status(response.status):
+                        raise ConnectionError(f"received error status code [{response.status}] "
+                                              f"from [{self.__class__.__name__}]")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            if not self.is_last_attempt(attempt):
+                await asyncio.sleep(self.get_retry_delay(attempt))
+        raise ConnectionError(f"max number of retries exceeded trying to get [{self.__class__.__name__}] data")
+
+    def get_data_cache_key(self, symbol: str, tf: int, ts_range: Tuple[int, int]) -> str:
+        # exchanges return differently shaped rows so the exchange is part of the key
+        return FileCache.make_key(self.__class__.__name__, symbol, tf, ts_range[0], ts_range[1])
+
+    def get_cached_data(self, symbol: str, tf: int, ts_range: Tuple[int, int]) -> List[List] | None:
+        return data_cache.get(self.get_data_cache_key(symbol, tf, ts_range))
+
+    def set_cached_data(self, symbol: str, tf: int, ts_range: Tuple[int, int], data: List[List]) -> None:
+        if len(data) == 0:
+            # ranges without data (e.g. exchange downtime) are only skipped for a short while
+            data_cache.set(self.get_data_cache_key(symbol, tf, ts_range),
+                           data,
+                           TimeUtil.hours_in_millis(ValiConfig.DATA_CACHE_EMPTY_TTL_HOURS))
+        # only closed candles are immutable, a range with a candle still forming has to be refetched
+        elif ts_range[1] < TimeUtil.now_in_millis() - TimeUtil.minute_in_millis(tf):
+            data_cache.set(self.get_data_cache_key(symbol, tf, ts_range), data)
+
+    @staticmethod
+    def get_retry_delay(attempt: int) -> float:
+        # capped exponential backoff w full jitter so validators retrying at the same time spread out
+        return random.uniform(0, min(ValiConfig.DATA_REQUEST_BACKOFF_MAX,
+                                     ValiConfig.DATA_REQUEST_BACKOFF_BASE * (2 ** attempt)))
+
+    @staticmethod
+    def is_last_attempt(attempt: int) -> bool:
+        # no point backing off once there are no attempts left
+        return attempt == ValiConfig.DATA_REQUEST_RETRIES - 1
+
+    @staticmethod
+    def is_retryable_status(status_code: int) -> bool:
+        # other 4xx responses will fail the same way again so they aren't retried
+        return status_code == 429 or status_code >= 500
+
     @staticmethod
     def convert_output_to_data_points(data_structure: List[List], days_data: List[List], order_to_ds: List[int]):
         """
@@ -24,4 +131,4 @@ class BaseFinancialMarketsGenerator(ABC):
             data_structure[1].append(float(tf_row[order_to_ds[1]]))
             data_structure[2].append(float(tf_row[order_to_ds[2]]))
             data_structure[3].append(float(tf_row[order_to_ds[3]]))
-            data_structure[4].append(float(tf_row[order_to_ds[4]]))
\ No newline at end of file
+            data_structure[4].append(float(tf_row[order_to_ds[4]]))
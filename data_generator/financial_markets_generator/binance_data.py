@@ -2,11 +2,10 @@
 # Copyright © 2023 Taoshi Inc
 
 from datetime import datetime
-from typing import List, Tuple
+from typing import Dict, List
 
-import requests
-from requests import Response
-import time
+import aiohttp
+import orjson
 
 from data_generator.financial_markets_generator.base_financial_markets_generator.base_financial_markets_generator import \
     BaseFinancialMarketsGenerator
@@ -14,6 +13,9 @@ from time_util.time_util import TimeUtil
 from vali_config import ValiConfig
 
 
+_KLINE_URL = "https://api.binance.com/api/v3/klines"
+
+
 class BinanceData(BaseFinancialMarketsGenerator):
     def __init__(self):
         super().__init__()
@@ -23,15 +25,9 @@ class BinanceData(BaseFinancialMarketsGenerator):
         self._tf = {
             5: "5m"
         }
+        self._order_to_ds = [0, 4, 2, 3, 5]
 
-    def get_data(self,
-                 symbol='BTCUSDT',
-                 interval=ValiConfig.STANDARD_TF,
-                 start=None,
-                 end=None,
-                 limit=1000,
-                 retries=0) -> Response:
-
+    def get_kline_params(self, symbol: str, interval: int, start, end, limit: int) -> Dict:
         if type(interval) == int:
             binance_interval = self._tf[interval]
         else:
@@ -39,41 +35,43 @@ class BinanceData(BaseFinancialMarketsGenerator):
 
         if start is None:
             # minute, minutes, hours, days, weeks
-            start = str(int(datetime.now().timestamp() * 1000) - 60000 * 60 * 24 * 7 * 2)
-            # start = str(int(datetime.now().timestamp() * 1000) - 60000 * 1250)
+            start = int(datetime.now().timestamp() * 1000) - 60000 * 60 * 24 * 7 * 2
+            # start = int(datetime.now().timestamp() * 1000) - 60000 * 1250
         if end is None:
-            end = str(int(datetime.now().timestamp() * 1000))
+            end = int(datetime.now().timestamp() * 1000)
 
         if symbol != "BTCUSDT":
             symbol = self._symbols[symbol]
 
-        url = f'https://api.binance.com/api/v3/klines?symbol={symbol}' \
-              f'&interval={binance_interval}&startTime={start}&endTime={end}&limit={limit}'
-
-        response = requests.get(url)
-
-        try:
-            if response.status_code == 200:
-                return response
-            else:
-                raise Exception("received error status code")
-        except Exception:
-            if retries < 5:
-                time.sleep(retries)
-                retries += 1
-                # print("retrying getting historical binance data")
-                self.get_data(symbol, interval, start, end, limit, retries)
-            else:
-                raise ConnectionError("max number of retries exceeded trying to get binance data")
+        return {
+            "symbol": symbol,
+            "interval": binance_interval,
+            "startTime": start,
+            "endTime": end,
+            "limit": limit
+        }
 
-    def get_data_and_structure_data_points(self, symbol: str, tf: int, data_structure: List[List], ts_range: Tuple[int, int]):
-        bd = self.get_data(symbol=symbol, interval=tf, start=ts_range[0], end=ts_range[1]).json()
+    def parse_data(self, content: bytes) -> List[List]:
+        bd = orjson.loads(content)
         if "msg" in bd:
             raise Exception("error occurred getting Binance data, please review", bd["msg"])
-        else:
-            # print("received binance historical data from : ", TimeUtil.millis_to_timestamp(ts_range[0]),
-            #       TimeUtil.millis_to_timestamp(ts_range[1]))
-            self.convert_output_to_data_points(data_structure,
-                                               bd,
-                                               [0, 4, 2, 3, 5]
-                                               )
+        return bd
+
+    def get_data(self,
+                 symbol='BTCUSDT',
+                 interval=ValiConfig.STANDARD_TF,
+                 start=None,
+                 end=None,
+                 limit=1000) -> List[List]:
+        params = self.get_kline_params(symbol, interval, start, end, limit)
+        return self.parse_data(self.request_data(_KLINE_URL, params))
+
+    async def get_data_async(self,
+                             session: aiohttp.ClientSession,
+                             symbol='BTCUSDT',
+                             interval=ValiConfig.STANDARD_TF,
+                             start=None,
+                             end=None,
+                             limit=1000) -> List[List]:
+        params = self.get_kline_params(symbol, interval, start, end, limit)
+        return self.parse_data(await self.request_data_async(session, _KLINE_URL, params))
@@ -1,67 +1,67 @@
-import requests
+import aiohttp
+import orjson
 from datetime import datetime
 
-import time
-from typing import List, Tuple
+from typing import Dict, List
 
 from data_generator.financial_markets_generator.base_financial_markets_generator.base_financial_markets_generator import \
     BaseFinancialMarketsGenerator
 
-import requests
-
 from time_util.time_util import TimeUtil
 from vali_config import ValiConfig
 
 
+_KLINE_URL = "https://api.bybit.com/v5/market/kline"
+
+
 class ByBitData(BaseFinancialMarketsGenerator):
     def __init__(self):
         super().__init__()
         self._symbols = {
             "BTCUSD": "BTCUSDT"
         }
+        self._order_to_ds = [0, 4, 2, 3, 5]
 
-    def get_data(self,
-                 symbol='BTCUSD',
-                 interval=ValiConfig.STANDARD_TF,
-                 start=None,
-                 end=None,
-                 retries=0,
-                 limit=1000):
-
+    def get_kline_params(self, symbol: str, interval: int, start, end, limit: int) -> Dict:
         if symbol != "BTCUSDT":
             symbol = self._symbols[symbol]
 
-        downshifted_start_by_one_unit = start - TimeUtil.minute_in_millis(interval)
-        downshifted_end_by_one_unit = end - TimeUtil.minute_in_millis(interval)
+        downshifted_start_by_one_unit = start - TimeUtil.minute_in_millis(interval) if start is not None else None
+        downshifted_end_by_one_unit = end - TimeUtil.minute_in_millis(interval) if end is not None else None
+
+        params = {
+            "category": "spot",
+            "symbol": symbol,
+            "interval": interval,
+            "start": downshifted_start_by_one_unit,
+            "end": downshifted_end_by_one_unit,
+            "limit": limit
+        }
+        # unset bounds are left off so the api defaults apply instead of sending "None"
+        return {key: value for key, value in params.items() if value is not None}
 
-        url = f"https://api.bybit.com/v5/market/kline?" \
-              f"category=spot&symbol={symbol}&interval={interval}&start={downshifted_start_by_one_unit}&end={downshifted_end_by_one_unit}&limit={limit}"
-        response = requests.get(url)
+    def parse_data(self, content: bytes) -> List[List]:
+        results = orjson.loads(content)["result"]["list"]
+        return sorted(results, key=lambda x: int(x[0]))
 
-        try:
-            if response.status_code == 200:
-                results = response.json()["result"]["list"]
-                reversed_data = sorted(results, key=lambda x: int(x[0]))
-                return reversed_data
-            else:
-                raise Exception(f"Failed to retrieve data. Status code: {response.status_code}")
-        except Exception:
-            if retries < 5:
-                time.sleep(retries)
-                retries += 1
-                # print("retrying getting historical bybit data")
-                self.get_data(symbol, interval, start, end, retries)
-            else:
-                raise ConnectionError("max number of retries exceeded trying to get bybit data")
+    def get_data(self,
+                 symbol='BTCUSD',
+                 interval=ValiConfig.STANDARD_TF,
+                 start=None,
+                 end=None,
+                 limit=1000) -> List[List]:
+        params = self.get_kline_params(symbol, interval, start, end, limit)
+        return self.parse_data(self.request_data(_KLINE_URL, params))
 
-    def get_data_and_structure_data_points(self, symbol: str, tf: int, data_structure: List[List], ts_range: Tuple[int, int]):
-        bd = self.get_data(symbol=symbol, interval= tf, start=ts_range[0], end=ts_range[1])
-        # print("received bybit historical data from : ", TimeUtil.millis_to_timestamp(ts_range[0]),
-        #       TimeUtil.millis_to_timestamp(ts_range[1]))
-        self.convert_output_to_data_points(data_structure,
-                                           bd,
-                                           [0, 4, 2, 3, 5]
-                                           )
+    async def get_data_async(self,
+                             session: aiohttp.ClientSession,
+                             symbol='BTCUSD',
+                             interval=ValiConfig.STANDARD_TF,
+                             start=None,
+                             end=None,
+                             limit=1000) -> List[List]:
+        params = self.get_kline_params(symbol, interval, start, end, limit)
+        return self.parse_data(await self.request_data_async(session, _KLINE_URL, params))
 
     @staticmethod
     def convert_output_to_data_points(data_structure: List[List], days_data: List[List], order_to_ds: List[int]):
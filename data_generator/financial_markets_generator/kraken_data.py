@@ -1,15 +1,18 @@
-import time
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from data_generator.financial_markets_generator.base_financial_markets_generator.base_financial_markets_generator import \
     BaseFinancialMarketsGenerator
 
-import requests
+import aiohttp
+import orjson
 
 from time_util.time_util import TimeUtil
 from vali_config import ValiConfig
 
 
+_OHLC_URL = "https://api.kraken.com/0/public/OHLC"
+
+
 class KrakenData(BaseFinancialMarketsGenerator):
     def __init__(self):
         super().__init__()
@@ -17,33 +20,37 @@ class KrakenData(BaseFinancialMarketsGenerator):
             "BTCUSD": "XXBTZUSD"
         }
 
+    def get_ohlc_params(self, pair: str, interval: int, start) -> Dict:
+        params = {
+            "pair": pair,
+            "interval": interval,
+            "since": start
+        }
+        return {key: value for key, value in params.items() if value is not None}
+
+    @staticmethod
+    def parse_data(content: bytes, pair: str, end: int) -> List[List]:
+        data = orjson.loads(content)["result"][pair]
+        return [entry for entry in data if entry[0] <= end * 1000]
+
     def get_data(self,
                  symbol='BTCUSD',
                  interval=ValiConfig.STANDARD_TF,
                  start=None,
-                 end=None,
-                 retries=0):
-
+                 end=None):
         pair = self.symbols[symbol]
+        content = self.request_data(_OHLC_URL, self.get_ohlc_params(pair, interval, start))
+        return self.parse_data(content, pair, end)
 
-        url = f"https://api.kraken.com/0/public/OHLC?pair={pair}&interval={interval}&since={start}"
-
-        response = requests.get(url)
-
-        try:
-            if response.status_code == 200:
-                data = response.json()["result"][pair]
-                return [entry for entry in data if entry[0] <= end * 1000]
-            else:
-                raise Exception(f"Failed to retrieve data. Status code: {response.status_code}")
-        except Exception:
-            if retries < 5:
-                time.sleep(retries)
-                retries += 1
-                print("retrying getting historical kraken data")
-                self.get_data(symbol, interval, start, end, retries)
-            else:
-                raise ConnectionError("max number of retries exceeded trying to get kraken data")
+    async def get_data_async(self,
+                             session: aiohttp.ClientSession,
+                             symbol='BTCUSD',
+                             interval=ValiConfig.STANDARD_TF,
+                             start=None,
+                             end=None):
+        pair = self.symbols[symbol]
+        content = await self.request_data_async(session, _OHLC_URL, self.get_ohlc_params(pair, interval, start))
+        return self.parse_data(content, pair, end)
 
     def get_data_and_structure_data_points(self, symbol: str, data_structure: List[List], ts_range: Tuple[int, int]):
         kd = self.get_data(symbol=symbol, start=ts_range[0], end=ts_range[1])
@@ -56,3 +63,13 @@ class KrakenData(BaseFinancialMarketsGenerator):
                                            [1,2,3,6]
                                            )
 
+    async def get_data_and_structure_data_points_async(self,
+                                                       session: aiohttp.ClientSession,
+                                                       symbol: str,
+                                                       data_structure: List[List],
+                                                       ts_range: Tuple[int, int]):
+        kd = await self.get_data_async(session, symbol=symbol, start=ts_range[0], end=ts_range[1])
+        self.convert_output_to_data_points(data_structure,
+                                           kd,
+                                           [1,2,3,6]
+                                           )
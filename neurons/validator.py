@@ -2,13 +2,12 @@
 # Copyright © 2023 Yuma Rao
 # developer: Taoshidev
 # Copyright © 2023 Taoshi Inc
-import hashlib
+import asyncio
 import os
 import random
 import time
 import uuid
-from datetime import datetime
-from typing import List
+from typing import Dict, List, Tuple
 
 import argparse
 import traceback
@@ -19,6 +18,7 @@ import bittensor as bt
 import numpy as np
 import torch
 
+from data_generator.cache import data_cache
 from data_generator.data_generator_handler import DataGeneratorHandler
 from data_generator.financial_markets_generator.binance_data import BinanceData
 from vali_objects.cmw.cmw_objects.cmw import CMW
@@ -80,408 +80,455 @@ def get_config():
     return config
 
 
-def run_time_series_validation(wallet, config, metagraph, vali_requests: List[BaseRequestDataClass]):
+def is_debug_logging() -> bool:
+    # bt.logging emits debug lines when either debug or trace is on, checked up front so
+    # debug messages that format timestamps, arrays or score dicts aren't built for nothing
+    return getattr(bt.logging, "__debug_on__", True) or getattr(bt.logging, "__trace_on__", False)
 
-    # Set up initial scoring weights for validation
-    # bt.logging.info("Building validation weights.")
-    # scores = torch.ones_like(metagraph.S, dtype=torch.float32)
-    # bt.logging.info(f"Weights: {scores}")
 
-    pred_metagraph_hotkeys = []
+async def handle_training_request(config, wallet, subtensor, dendrite, metagraph, vali_request: TrainingRequest):
+    # standardized request identifier for miners to tie together forward/backprop
+    request_uuid = str(uuid.uuid4())
+    data_generator_handler = DataGeneratorHandler()
 
-    for vali_request in vali_requests:
-        # standardized request identifier for miners to tie together forward/backprop
-        request_uuid = str(uuid.uuid4())
-        data_generator_handler = DataGeneratorHandler()
-
-        if isinstance(vali_request, TrainingRequest):
-            # stream_type = hash(str(vali_request.stream_type) + wallet.hotkey.ss58_address)
-            # stream_type = hash(str(vali_request.stream_type))
-            # hash_object = hashlib.sha256(vali_request.stream_type.encode())
-            # stream_type = hash_object.hexdigest()
-
-            stream_type = vali_request.stream_type
-
-            start_dt, end_dt, ts_ranges = ValiUtils.randomize_days(True)
-            bt.logging.info(f"sending training data on stream type [{stream_type}] "
-                           f"with params start date [{start_dt}] & [{end_dt}] ")
-
-            ds = ValiUtils.get_standardized_ds()
-
-            for ts_range in ts_ranges:
-                data_generator_handler.data_generator_handler(vali_request.topic_id,
-                                                              0,
-                                                              vali_request.additional_details,
-                                                              ds,
-                                                              ts_range)
-
-            vmins, vmaxs, dps, sds = Scaling.scale_ds_with_ts(ds)
-            samples = bt.tensor(sds)
-
-            training_proto = TrainingForward(
-                request_uuid=request_uuid,
-                stream_id=stream_type,
-                samples=samples,
-                topic_id=vali_request.topic_id,
-                feature_ids=vali_request.feature_ids,
-                schema_id=vali_request.schema_id,
-                prediction_size=vali_request.prediction_size
-            )
+    # stream type is used as the stream id as is so it stays the same across validator restarts
+    stream_type = vali_request.stream_type
 
-            try:
-                responses = dendrite.query(
-                    metagraph.axons,
-                    training_proto,
-                    deserialize=True,
-                    timeout=30
-                )
+    start_dt, end_dt, ts_ranges = ValiUtils.randomize_days(True)
+    training_results_start = TimeUtil.timestamp_to_millis(end_dt)
+    training_results_end = training_results_start + \
+        TimeUtil.minute_in_millis(vali_request.prediction_size * ValiConfig.STANDARD_TF)
+    bt.logging.info(f"sending training data on stream type [{stream_type}] "
+                   f"with params start date [{start_dt}] & [{end_dt}] ")
 
-                # # check to see # of responses
-                # bt.logging.info(f"number of responses to training data: [{responses}]")
-
-                # FOR DEBUG PURPOSES
-                # for i, respi in enumerate(responses):
-                #     if respi is not None \
-                #             and len(respi.numpy()) == vali_request.prediction_size:
-                #         bt.logging.debug(f"number of responses to training data: [{len(respi.numpy())}]")
-                #     else:
-                #         bt.logging.debug(f"has no proper response")
-
-                training_results_start = TimeUtil.timestamp_to_millis(end_dt)
-                training_results_end = TimeUtil.timestamp_to_millis(end_dt) + \
-                      TimeUtil.minute_in_millis(vali_request.prediction_size * ValiConfig.STANDARD_TF)
-
-                results_ds = ValiUtils.get_standardized_ds()
-                bt.logging.info("getting training results to send back to miners")
-
-                # binance_data.get_data_and_structure_data_points(vali_request.stream_type,
-                #                                                results_ds,
-                #                                                (training_results_start, training_results_end))
-                data_generator_handler.data_generator_handler(vali_request.topic_id,
-                                                              0,
-                                                              vali_request.additional_details,
-                                                              results_ds,
-                                                              (training_results_start, training_results_end))
-                bt.logging.info("results gathered, sending back to miners")
-
-                results_vmin, results_vmax, results_scaled = Scaling.scale_values(results_ds[0],
-                                                                                      vmin=vmins[0],
-                                                                                      vmax=vmaxs[0])
-                results = bt.tensor(results_scaled)
-
-                training_backprop_proto = TrainingBackward(
-                    request_uuid=request_uuid,
-                    stream_id=stream_type,
-                    samples=results,
-                    topic_id=vali_request.topic_id
-                )
+    ds = ValiUtils.get_standardized_ds()
 
-                dendrite.query(
-                    metagraph.axons,
-                    training_backprop_proto,
-                    deserialize=True,
-                    timeout=30
-                )
-                bt.logging.info("results sent back to miners")
+    # ranges are independent so they are fetched concurrently and merged back in order
+    await data_generator_handler.data_generator_handler_ranges_async(vali_request.topic_id,
+                                                                     vali_request.additional_details,
+                                                                     ds,
+                                                                     ts_ranges)
 
-            # If we encounter an unexpected error, log it for debugging.
-            except RuntimeError as e:
-                bt.logging.error(e)
-                traceback.print_exc()
+    vmins, vmaxs, dps, sds = Scaling.scale_ds_with_ts(ds)
+    samples = bt.tensor(sds)
+
+    training_proto = TrainingForward(
+        request_uuid=request_uuid,
+        stream_id=stream_type,
+        samples=samples,
+        topic_id=vali_request.topic_id,
+        feature_ids=vali_request.feature_ids,
+        schema_id=vali_request.schema_id,
+        prediction_size=vali_request.prediction_size
+    )
 
-        elif isinstance(vali_request, ClientRequest):
-            # stream_type = hash(str(vali_request.stream_type) + wallet.hotkey.ss58_address)
-            # stream_type = hash(str(vali_request.stream_type))
-            # hash_object = hashlib.sha256(vali_request.stream_type.encode())
-            # stream_type = hash_object.hexdigest()
+    try:
+        await dendrite.forward(
+            metagraph.axons,
+            training_proto,
+            deserialize=True,
+            timeout=30
+        )
 
-            stream_type = vali_request.stream_type
+        # # check to see # of responses
+        # bt.logging.info(f"number of responses to training data: [{responses}]")
+
+        # FOR DEBUG PURPOSES
+        # for i, respi in enumerate(responses):
+        #     if respi is None:
+        #         continue
+        #     preds = respi.numpy()
+        #     if len(preds) == vali_request.prediction_size:
+        #         bt.logging.debug(f"number of responses to training data: [{len(preds)}]")
+        #     else:
+        #         bt.logging.debug(f"has no proper response")
+
+        results_ds = ValiUtils.get_standardized_ds()
+        bt.logging.info("getting training results to send back to miners")
+
+        # binance_data.get_data_and_structure_data_points(vali_request.stream_type,
+        #                                                results_ds,
+        #                                                (training_results_start, training_results_end))
+        await data_generator_handler.data_generator_handler_ranges_async(vali_request.topic_id,
+                                                                         vali_request.additional_details,
+                                                                         results_ds,
+                                                                         [(training_results_start,
+                                                                           training_results_end)])
+        bt.logging.info("results gathered, sending back to miners")
+
+        results_vmin, results_vmax, results_scaled = Scaling.scale_values(results_ds[0],
+                                                                              vmin=vmins[0],
+                                                                              vmax=vmaxs[0])
+        results = bt.tensor(results_scaled)
+
+        training_backprop_proto = TrainingBackward(
+            request_uuid=request_uuid,
+            stream_id=stream_type,
+            samples=results,
+            topic_id=vali_request.topic_id
+        )
 
-            if vali_request.client_uuid is None:
-                vali_request.client_uuid = wallet.hotkey.ss58_address
+        await dendrite.forward(
+            metagraph.axons,
+            training_backprop_proto,
+            deserialize=True,
+            timeout=30
+        )
+        bt.logging.info("results sent back to miners")
 
-            if int(config.test_only_historical) == 1:
-                bt.logging.debug("using historical only with a client request")
-                start_dt, end_dt, ts_ranges = ValiUtils.randomize_days(True)
-            else:
-                start_dt, end_dt, ts_ranges = ValiUtils.randomize_days(False)
-            bt.logging.info(f"sending requested data on stream type [{stream_type}] "
-                           f"with params start date [{start_dt}] & [{end_dt}] ")
-
-            ds = ValiUtils.get_standardized_ds()
-            for ts_range in ts_ranges:
-                # binance_data.get_data_and_structure_data_points(vali_request.stream_type,
-                #                                                ds,
-                #                                                ts_range)
-                data_generator_handler.data_generator_handler(vali_request.topic_id,
-                                                              0,
-                                                              vali_request.additional_details,
-                                                              ds,
-                                                              ts_range)
-
-            # vmins, vmaxs, dps, sds = Scaling.scale_ds_with_ts(ds)
-            samples = bt.tensor(np.array(ds))
-
-            live_proto = LiveForward(
-                request_uuid=request_uuid,
-                stream_id=stream_type,
-                samples=samples,
-                topic_id=vali_request.topic_id,
-                feature_ids=vali_request.feature_ids,
-                schema_id=vali_request.schema_id,
-                prediction_size=vali_request.prediction_size
-            )
+    # If we encounter an unexpected error, log it for debugging.
+    except RuntimeError as e:
+        bt.logging.error(e)
+        traceback.print_exc()
+
+
+async def handle_client_request(config, wallet, subtensor, dendrite, metagraph, vali_request: ClientRequest):
+    # standardized request identifier for miners to tie together forward/backprop
+    request_uuid = str(uuid.uuid4())
+    data_generator_handler = DataGeneratorHandler()
+
+    pred_metagraph_hotkeys = []
+
+    stream_type = vali_request.stream_type
+
+    if vali_request.client_uuid is None:
+        vali_request.client_uuid = wallet.hotkey.ss58_address
+
+    if int(config.test_only_historical) == 1:
+        bt.logging.debug("using historical only with a client request")
+        start_dt, end_dt, ts_ranges = ValiUtils.randomize_days(True)
+    else:
+        start_dt, end_dt, ts_ranges = ValiUtils.randomize_days(False)
+    prediction_start_time = TimeUtil.timestamp_to_millis(end_dt)
+    prediction_end_time = prediction_start_time + \
+        TimeUtil.minute_in_millis(vali_request.prediction_size * vali_request.additional_details["tf"])
+    bt.logging.info(f"sending requested data on stream type [{stream_type}] "
+                   f"with params start date [{start_dt}] & [{end_dt}] ")
+
+    ds = ValiUtils.get_standardized_ds()
+    await data_generator_handler.data_generator_handler_ranges_async(vali_request.topic_id,
+                                                                     vali_request.additional_details,
+                                                                     ds,
+                                                                     ts_ranges)
+
+    # vmins, vmaxs, dps, sds = Scaling.scale_ds_with_ts(ds)
+    samples = bt.tensor(np.array(ds))
+
+    live_proto = LiveForward(
+        request_uuid=request_uuid,
+        stream_id=stream_type,
+        samples=samples,
+        topic_id=vali_request.topic_id,
+        feature_ids=vali_request.feature_ids,
+        schema_id=vali_request.schema_id,
+        prediction_size=vali_request.prediction_size
+    )
+
+    try:
+        responses = await dendrite.forward(
+            metagraph.axons,
+            live_proto,
+            deserialize=True,
+            timeout=180
+        )
 
+        # # check to see # of responses
+        bt.logging.info(f"number of responses to requested data: [{len(responses)}]")
+
+        # FOR DEBUG PURPOSES
+        # for i, respi in enumerate(responses):
+        #     predictions = respi.predictions.numpy()
+        #     print(predictions)
+        #     if respi is not None \
+        #             and len(respi) == vali_request.prediction_size:
+        #         bt.logging.debug(f"index [{i}] number of responses to requested data [{len(respi)}]")
+        #     else:
+        #         bt.logging.debug(f"index [{i}] has no proper response")
+
+        debug_on = is_debug_logging()
+        if debug_on:
+            bt.logging.debug(f"prediction start time [{prediction_start_time}], [{TimeUtil.millis_to_timestamp(prediction_start_time)}]")
+            bt.logging.debug(f"prediction end time [{prediction_end_time}], [{TimeUtil.millis_to_timestamp(prediction_end_time)}]")
+
+        for i, resp_i in enumerate(responses):
+            if resp_i.predictions is None:
+                continue
+            miner_hotkey = metagraph.axons[i].hotkey
             try:
-                responses = dendrite.query(
-                    metagraph.axons,
-                    live_proto,
-                    deserialize=True,
-                    timeout=180
+                # materialized once and reused for the checks and the stored prediction file
+                predictions = resp_i.predictions.numpy()
+                if len(predictions) != vali_request.prediction_size or len(predictions.shape) != 1:
+                    continue
+                pred_metagraph_hotkeys.append(miner_hotkey)
+                # for file name
+                output_uuid = str(uuid.uuid4())
+                if debug_on:
+                    bt.logging.debug(f"axon hotkey has correctly responded: [{miner_hotkey}]")
+
+                # has the right number of predictions made
+                pdf = PredictionDataFile(
+                    client_uuid=vali_request.client_uuid,
+                    stream_type=vali_request.stream_type,
+                    stream_id=stream_type,
+                    topic_id=vali_request.topic_id,
+                    request_uuid=request_uuid,
+                    miner_uid=miner_hotkey,
+                    start=prediction_start_time,
+                    end=prediction_end_time,
+                    predictions=predictions,
+                    prediction_size=vali_request.prediction_size,
+                    additional_details=vali_request.additional_details
                 )
+                ValiUtils.save_predictions_request(output_uuid, pdf)
+            except Exception as e:
+                bt.logging.debug(f"not correctly configured predictions: [{miner_hotkey}]")
+                continue
+        bt.logging.info(f"all hotkeys of accurately formatted predictions received {pred_metagraph_hotkeys}")
+        bt.logging.info("completed storing all predictions")
+
+    # If we encounter an unexpected error, log it for debugging.
+    except RuntimeError as e:
+        bt.logging.error(e)
+        traceback.print_exc()
+
+
+async def handle_prediction_request(config, wallet, subtensor, dendrite, metagraph,
+                                    vali_request: PredictionRequest) -> Tuple[str, Dict | None, List[str]] | None:
+    # returns the (request uuid, cmw results, processed files) left to persist once all requests are handled
+    # standardized request identifier for miners to tie together forward/backprop
+    request_uuid = str(uuid.uuid4())
+    data_generator_handler = DataGeneratorHandler()
+
+    bt.logging.info("processing predictions ready to be weighed")
+    # handle results ready to score and weigh
+    request_df = vali_request.df
+    stream_type = request_df.stream_type
+    processed_files = []
+    cmw_results = None
+    try:
+        data_structure = ValiUtils.get_standardized_ds()
+
+        bt.logging.info("getting results from live predictions")
+
+        debug_on = is_debug_logging()
+        if debug_on:
+            bt.logging.debug(f"requested results start: [{TimeUtil.millis_to_timestamp(request_df.start)}]")
+            bt.logging.debug(f"requested results end: [{TimeUtil.millis_to_timestamp(request_df.end)}]")
+
+        await data_generator_handler.data_generator_handler_ranges_async(request_df.topic_id,
+                                                                         request_df.additional_details,
+                                                                         data_structure,
+                                                                         [(request_df.start, request_df.end)])
+
+        if debug_on:
+            bt.logging.debug(f"number of results: [{len(data_structure[0])}]")
+            bt.logging.debug(f"gathered results start: [{TimeUtil.millis_to_timestamp(data_structure[0][0])}]")
+            bt.logging.debug(f"gathered results end: [{TimeUtil.millis_to_timestamp(data_structure[0][len(data_structure[0]) - 1])}]")
+
+        bt.logging.info("results gathered sending back to miners via backprop and weighing")
+
+        # results_vmin, results_vmax, results_scaled = Scaling.scale_values(data_structure[1],
+        #                                                                       vmin=request_df.vmins[0],
+        #                                                                       vmax=request_df.vmaxs[0])
+        # send back the results for backprop so miners can learn
+        results = bt.tensor(np.array(data_structure[1]))
+
+        results_backprop_proto = LiveBackward(
+            request_uuid=request_uuid,
+            stream_id=stream_type,
+            samples=results,
+            topic_id=request_df.topic_id
+        )
+
+        try:
+            await dendrite.forward(
+                metagraph.axons,
+                results_backprop_proto,
+                deserialize=True
+            )
+            bt.logging.info("live results sent back to miners")
+        except Exception:
+            traceback.print_exc()
+            bt.logging.info("failed sending back results to miners and continuing...")
 
-                # # check to see # of responses
-                bt.logging.info(f"number of responses to requested data: [{len(responses)}]")
-
-                # FOR DEBUG PURPOSES
-                # for i, respi in enumerate(responses):
-                #     predictions = respi.predictions.numpy()
-                #     print(predictions)
-                #     if respi is not None \
-                #             and len(respi) == vali_request.prediction_size:
-                #         bt.logging.debug(f"index [{i}] number of responses to requested data [{len(respi)}]")
-                #     else:
-                #         bt.logging.debug(f"index [{i}] has no proper response")
-                prediction_start_time = TimeUtil.timestamp_to_millis(end_dt)
-                prediction_end_time = TimeUtil.timestamp_to_millis(end_dt) + \
-                TimeUtil.minute_in_millis(vali_request.prediction_size *
-                                          vali_request.additional_details["tf"])
-
-                bt.logging.debug(f"prediction start time [{prediction_start_time}], [{TimeUtil.millis_to_timestamp(prediction_start_time)}]")
-                bt.logging.debug(f"prediction end time [{prediction_end_time}], [{TimeUtil.millis_to_timestamp(prediction_end_time)}]")
-
-                for i, resp_i in enumerate(responses):
-                    if resp_i.predictions is not None:
-                        try:
-                            predictions = resp_i.predictions.numpy()
-                            if len(predictions) == vali_request.prediction_size and len(predictions.shape) == 1:
-                                pred_metagraph_hotkeys.append(metagraph.axons[i].hotkey)
-                                # for file name
-                                output_uuid = str(uuid.uuid4())
-                                bt.logging.debug(f"axon hotkey has correctly responded: [{metagraph.axons[i].hotkey}]")
-
-                                # has the right number of predictions made
-                                pdf = PredictionDataFile(
-                                    client_uuid=vali_request.client_uuid,
-                                    stream_type=vali_request.stream_type,
-                                    stream_id=stream_type,
-                                    topic_id=vali_request.topic_id,
-                                    request_uuid=request_uuid,
-                                    miner_uid=metagraph.axons[i].hotkey,
-                                    start=prediction_start_time,
-                                    end=prediction_end_time,
-                                    predictions=predictions,
-                                    prediction_size=vali_request.prediction_size,
-                                    additional_details=vali_request.additional_details
-                                )
-                                ValiUtils.save_predictions_request(output_uuid, pdf)
-                        except Exception as e:
-                            bt.logging.debug(f"not correctly configured predictions: [{metagraph.axons[i].hotkey}]")
-                            continue
-                bt.logging.info(f"all hotkeys of accurately formatted predictions received {pred_metagraph_hotkeys}")
-                bt.logging.info("completed storing all predictions")
-
-            # If we encounter an unexpected error, log it for debugging.
-            except RuntimeError as e:
+        sized_predictions = {}
+        for miner_uid, miner_preds in vali_request.predictions.items():
+            try:
+                Scoring.check_prediction_size(miner_preds, data_structure[1])
+                sized_predictions[miner_uid] = miner_preds
+            except IncorrectPredictionSizeError as e:
                 bt.logging.error(e)
                 traceback.print_exc()
+        # all correctly sized predictions are scored together in one pass
+        scores = Scoring.score_response_batch(sized_predictions, data_structure[1])
 
-        elif isinstance(vali_request, PredictionRequest):
-            bt.logging.info("processing predictions ready to be weighed")
-            # handle results ready to score and weigh
-            request_df = vali_request.df
-            # stream_type = hash(str(request_df.stream_type) + wallet.hotkey.ss58_address)
-            # hash_object = hashlib.sha256(request_df.stream_type.encode())
-            # stream_type = hash_object.hexdigest()
-            stream_type = request_df.stream_type
-            try:
-                data_structure = ValiUtils.get_standardized_ds()
+        if len(scores) > 0:
 
-                bt.logging.info("getting results from live predictions")
+            if debug_on:
+                bt.logging.debug(f"unscaled scores [{scores}]")
+            scores_list = np.array([score for miner_uid, score in scores.items()])
+            variance = np.var(scores_list)
 
-                bt.logging.debug(f"requested results start: [{TimeUtil.millis_to_timestamp(request_df.start)}]")
-                bt.logging.debug(f"requested results end: [{TimeUtil.millis_to_timestamp(request_df.end)}]")
+            if variance == 0:
+                bt.logging.debug("homogenous dataset, going to equally distribute scores")
+                weighed_scores = [(miner_uid, 1 / len(scores)) for miner_uid, score in scores.items()]
+                if debug_on:
+                    bt.logging.debug(f"weighed scores [{weighed_scores}]")
+                weighed_winning_scores_dict, weight = Scoring.update_weights_using_historical_distributions(
+                    weighed_scores, data_structure)
 
-                data_generator_handler.data_generator_handler(request_df.topic_id,
-                                                              0,
-                                                              request_df.additional_details,
-                                                              data_structure,
-                                                              (request_df.start, request_df.end))
+            else:
+                scaled_scores = Scoring.simple_scale_scores(scores)
 
-                bt.logging.debug(f"number of results: [{len(data_structure[0])}]")
-                bt.logging.debug(f"gathered results start: [{TimeUtil.millis_to_timestamp(data_structure[0][0])}]")
-                bt.logging.debug(f"gathered results end: [{TimeUtil.millis_to_timestamp(data_structure[0][len(data_structure[0]) - 1])}]")
+                # store weights for results, every miner is weighed so no ordering is needed
+                winning_scores = list(scaled_scores.items())
 
-                bt.logging.info("results gathered sending back to miners via backprop and weighing")
+                weighed_scores = Scoring.weigh_miner_scores(winning_scores)
+                weighed_winning_scores_dict, weight = Scoring.update_weights_using_historical_distributions(weighed_scores, data_structure)
+                # weighed_winning_scores_dict = {score[0]: score[1] for score in weighed_winning_scores}
 
-                # results_vmin, results_vmax, results_scaled = Scaling.scale_values(data_structure[1],
-                #                                                                       vmin=request_df.vmins[0],
-                #                                                                       vmax=request_df.vmaxs[0])
-                # send back the results for backprop so miners can learn
-                results = bt.tensor(np.array(data_structure[1]))
+                if debug_on:
+                    bt.logging.debug(f"weight for the predictions: [{weight}]")
+                    bt.logging.debug(f"scaled scores: [{scaled_scores}]")
+                    bt.logging.debug(f"weighed winning scores: [{weighed_winning_scores_dict}]")
 
-                results_backprop_proto = LiveBackward(
-                    request_uuid=request_uuid,
-                    stream_id=stream_type,
-                    samples=results,
-                    topic_id=request_df.topic_id
-                )
 
-                try:
-                    dendrite.query(
-                        metagraph.axons,
-                        results_backprop_proto,
-                        deserialize=True
-                    )
-                    bt.logging.info("live results sent back to miners")
-                except Exception:
-                    traceback.print_exc()
-                    bt.logging.info("failed sending back results to miners and continuing...")
-
-                scores = {}
-                for miner_uid, miner_preds in vali_request.predictions.items():
-                    try:
-                        scores[miner_uid] = Scoring.score_response(miner_preds, data_structure[1])
-                    except IncorrectPredictionSizeError as e:
-                        bt.logging.error(e)
-                        traceback.print_exc()
-
-                if len(scores) > 0:
-
-                    bt.logging.debug(f"unscaled scores [{scores}]")
-                    scores_list = np.array([score for miner_uid, score in scores.items()])
-                    variance = np.var(scores_list)
-
-                    if variance == 0:
-                        bt.logging.debug("homogenous dataset, going to equally distribute scores")
-                        weighed_scores = [(miner_uid, 1 / len(scores)) for miner_uid, score in scores.items()]
-                        bt.logging.debug(f"weighed scores [{weighed_scores}]")
-                        weighed_winning_scores_dict, weight = Scoring.update_weights_using_historical_distributions(
-                            weighed_scores, data_structure)
-
-                    else:
-                        scaled_scores = Scoring.simple_scale_scores(scores)
-
-                        # store weights for results
-                        sorted_scores = sorted(scaled_scores.items(), key=lambda x: x[1], reverse=True)
-                        winning_scores = sorted_scores
-
-                        # choose top 10
-                        weighed_scores = Scoring.weigh_miner_scores(winning_scores)
-                        weighed_winning_scores_dict, weight = Scoring.update_weights_using_historical_distributions(weighed_scores, data_structure)
-                        # weighed_winning_scores_dict = {score[0]: score[1] for score in weighed_winning_scores}
-
-                        bt.logging.debug(f"weight for the predictions: [{weight}]")
-                        bt.logging.debug(f"scaled scores: [{scaled_scores}]")
-                        bt.logging.debug(f"weighed winning scores: [{weighed_winning_scores_dict}]")
-
-
-                    # bt.logging.debug(f"finalized weighed winning scores [{weighed_winning_scores}]")
-                    weights = []
-                    converted_uids = []
-
-                    deregistered_mineruids = []
-
-                    for miner_uid, weighed_winning_score in weighed_winning_scores_dict.items():
-                        try:
-                            converted_uids.append(metagraph.uids[metagraph.hotkeys.index(miner_uid)])
-                            weights.append(weighed_winning_score)
-                        except Exception:
-                            deregistered_mineruids.append(miner_uid)
-                            bt.logging.info(f"not able to find miner hotkey, "
-                                            f"likely deregistered [{miner_uid}]")
-
-                    Scoring.update_weights_remove_deregistrations(deregistered_mineruids)
-
-                    bt.logging.debug(f"converted uids [{converted_uids}]")
-                    bt.logging.debug(f"set weights [{weights}]")
-
-                    result = subtensor.set_weights(
-                        netuid=config.netuid,  # Subnet to set weights on.
-                        wallet=wallet,  # Wallet to sign set weights using hotkey.
-                        uids=converted_uids,  # Uids of the miners to set weights for.
-                        weights=weights,  # Weights to set for the miners.
-                        # wait_for_inclusion=True,
-                    )
-                    if result:
-                        bt.logging.success('Successfully set weights.')
-                        bt.logging.info("removing processed files")
-                        # remove files that have been properly processed & weighed
-                        for file in vali_request.files:
-                            os.remove(file)
-                        bt.logging.info(f"removed [{len(vali_request.files)}] processed files")
-
-                    else:
-                        bt.logging.error('Failed to set weights.')
-                    bt.logging.info("weights set and stored")
-                    bt.logging.info("adding to cmw")
-
-                    time_now = TimeUtil.now_in_millis()
-                    try:
-                        new_cmw = CMW()
-                        cmw_client = CMWClient()\
-                            .set_client_uuid(request_df.client_uuid)
-                        cmw_client.add_stream(
-                            CMWStreamType()
-                            .set_stream_id(stream_type)
-                            .set_topic_id(request_df.topic_id))
-                        new_cmw.add_client(cmw_client)
-                        cmw_client.add_stream(CMWStreamType()
-                                              .set_stream_id(stream_type)
-                                              .set_topic_id(request_df.topic_id))
-                        stream = cmw_client.get_stream(stream_type)
-                        for miner_uid, score in scores.items():
-                            bt.logging.debug(f"adding mineruid [{miner_uid}]")
-                            stream_miner = CMWMiner(miner_uid)
-                            stream.add_miner(stream_miner)
-                            bt.logging.debug("miner added")
-                            stream_miner.add_unscaled_score([time_now, scores[miner_uid]])
-                            if miner_uid in weighed_winning_scores_dict:
-                                if weighed_winning_scores_dict[miner_uid] != 0:
-                                    bt.logging.debug(f"adding winning miner [{miner_uid}]")
-                                    stream_miner.add_win_score([time_now, weighed_winning_scores_dict[miner_uid]])
-                        ValiUtils.save_cmw_results(request_df.request_uuid, CMWUtil.dump_cmw(new_cmw))
-                        bt.logging.info("cmw saved: ", request_df.request_uuid)
-                    except Exception as e:
-                        # if fail to store cmw for some reason print & continue
-                        bt.logging.error(e)
-                        traceback.print_exc()
-
-                    bt.logging.info("scores attempted to be stored in cmw")
-                    bt.logging.info("run complete.")
+            # bt.logging.debug(f"finalized weighed winning scores [{weighed_winning_scores}]")
+            weights = []
+            converted_uids = []
+
+            deregistered_mineruids = []
+
+            # index built once rather than scanning the metagraph hotkeys for every miner
+            hotkey_to_uid = {hotkey: metagraph.uids[i] for i, hotkey in enumerate(metagraph.hotkeys)}
+
+            for miner_uid, weighed_winning_score in weighed_winning_scores_dict.items():
+                if miner_uid in hotkey_to_uid:
+                    converted_uids.append(hotkey_to_uid[miner_uid])
+                    weights.append(weighed_winning_score)
                 else:
-                    bt.logging.info("there are no predictions to score that have the right number of predictions")
-            # If we encounter an unexpected error, log it for debugging.
-            except RuntimeError as e:
-                bt.logging.error(e)
-                traceback.print_exc()
-            except MinResponsesException as e:
-                bt.logging.info("removing processed files as min responses "
-                                "not met to not continue to iterate over them")
-                for file in vali_request.files:
-                    os.remove(file)
-                bt.logging.error(e)
-                traceback.print_exc()
-            except IncorrectLiveResultsCountException as e:
-                bt.logging.info("removing processed files as can't get accurate live results")
-                for file in vali_request.files:
-                    os.remove(file)
-                bt.logging.error(e)
-                traceback.print_exc()
+                    deregistered_mineruids.append(miner_uid)
+                    bt.logging.info(f"not able to find miner hotkey, "
+                                    f"likely deregistered [{miner_uid}]")
+
+            Scoring.update_weights_remove_deregistrations(deregistered_mineruids)
+
+            if debug_on:
+                bt.logging.debug(f"converted uids [{converted_uids}]")
+                bt.logging.debug(f"set weights [{weights}]")
+
+            result = subtensor.set_weights(
+                netuid=config.netuid,  # Subnet to set weights on.
+                wallet=wallet,  # Wallet to sign set weights using hotkey.
+                uids=converted_uids,  # Uids of the miners to set weights for.
+                weights=weights,  # Weights to set for the miners.
+                # wait_for_inclusion=True,
+            )
+            if result:
+                bt.logging.success('Successfully set weights.')
+                # files that have been properly processed & weighed are removed after the cmw is saved
+                processed_files = vali_request.files
+
+            else:
+                bt.logging.error('Failed to set weights.')
+            bt.logging.info("weights set and stored")
+            bt.logging.info("adding to cmw")
+
+            time_now = TimeUtil.now_in_millis()
+            try:
+                new_cmw = CMW()
+                cmw_client = CMWClient()\
+                    .set_client_uuid(request_df.client_uuid)
+                cmw_client.add_stream(
+                    CMWStreamType()
+                    .set_stream_id(stream_type)
+                    .set_topic_id(request_df.topic_id))
+                new_cmw.add_client(cmw_client)
+                cmw_client.add_stream(CMWStreamType()
+                                      .set_stream_id(stream_type)
+                                      .set_topic_id(request_df.topic_id))
+                stream = cmw_client.get_stream(stream_type)
+                for miner_uid, score in scores.items():
+                    stream_miner = CMWMiner(miner_uid)
+                    stream.add_miner(stream_miner)
+                    if debug_on:
+                        bt.logging.debug(f"added mineruid [{miner_uid}]")
+                    stream_miner.add_unscaled_score([time_now, scores[miner_uid]])
+                    if miner_uid in weighed_winning_scores_dict:
+                        if weighed_winning_scores_dict[miner_uid] != 0:
+                            if debug_on:
+                                bt.logging.debug(f"adding winning miner [{miner_uid}]")
+                            stream_miner.add_win_score([time_now, weighed_winning_scores_dict[miner_uid]])
+                cmw_results = CMWUtil.dump_cmw(new_cmw)
             except Exception as e:
+                # if fail to store cmw for some reason print & continue
                 bt.logging.error(e)
                 traceback.print_exc()
 
+            bt.logging.info("scores attempted to be added to cmw")
+            bt.logging.info("run complete.")
+        else:
+            bt.logging.info("there are no predictions to score that have the right number of predictions")
+    # If we encounter an unexpected error, log it for debugging.
+    except RuntimeError as e:
+        bt.logging.error(e)
+        traceback.print_exc()
+    except MinResponsesException as e:
+        bt.logging.info("removing processed files as min responses "
+                        "not met to not continue to iterate over them")
+        processed_files = vali_request.files
+        bt.logging.error(e)
+        traceback.print_exc()
+    except IncorrectLiveResultsCountException as e:
+        bt.logging.info("removing processed files as can't get accurate live results")
+        processed_files = vali_request.files
+        bt.logging.error(e)
+        traceback.print_exc()
+    except Exception as e:
+        bt.logging.error(e)
+        traceback.print_exc()
+    return request_df.request_uuid, cmw_results, processed_files
+
+
+async def dispatch_request(config, wallet, subtensor, dendrite, metagraph, vali_request: BaseRequestDataClass):
+    if isinstance(vali_request, TrainingRequest):
+        await handle_training_request(config, wallet, subtensor, dendrite, metagraph, vali_request)
+    elif isinstance(vali_request, ClientRequest):
+        await handle_client_request(config, wallet, subtensor, dendrite, metagraph, vali_request)
+    elif isinstance(vali_request, PredictionRequest):
+        return await handle_prediction_request(config, wallet, subtensor, dendrite, metagraph, vali_request)
+
+
+def run_time_series_validation(config, wallet, subtensor, dendrite, metagraph,
+                               vali_requests: List[BaseRequestDataClass]):
+
+    # Set up initial scoring weights for validation
+    # bt.logging.info("Building validation weights.")
+    # scores = torch.ones_like(metagraph.S, dtype=torch.float32)
+    # bt.logging.info(f"Weights: {scores}")
+
+    # requests are independent of each other (different request uuids) so they're handled concurrently,
+    # the loop is reused across runs as the dendrite's client session is bound to the loop it was created in
+    # a failing request doesn't discard the others, a prediction request may already have set weights
+    results = asyncio.get_event_loop().run_until_complete(
+        asyncio.gather(*[dispatch_request(config, wallet, subtensor, dendrite, metagraph, vali_request)
+                         for vali_request in vali_requests],
+                       return_exceptions=True)
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            bt.logging.error(result)
+            traceback.print_exception(type(result), result, result.__traceback__)
+    completed_requests = [result for result in results
+                          if result is not None and not isinstance(result, BaseException)]
+    for request_uuid, e in ValiUtils.complete_prediction_requests(completed_requests):
+        # if fail to store cmw for some reason print & continue
+        bt.logging.error(f"failed to store cmw for [{request_uuid}]: {e}")
+        traceback.print_exception(type(e), e, e.__traceback__)
+    processed_files_count = sum([len(request_files) for _, _, request_files in completed_requests])
+    if processed_files_count > 0:
+        bt.logging.info(f"removed [{processed_files_count}] processed files")
+
 
 # The main function parses the configuration and runs the validator.
 if __name__ == "__main__":
@@ -534,34 +581,38 @@ if __name__ == "__main__":
     time_interval = random.randint(0, 550)
     bt.logging.info("sleep time interval: ", time_interval)
     while True:
-        current_time = datetime.now().time()
-        if current_time.minute in [0, 30]:
-            time.sleep(time_interval)
-            # updating metagraph before run
-            metagraph.sync(subtensor = subtensor)
-            bt.logging.info(f"Metagraph: {metagraph}")
+        # sleep through to the next :00 or :30 rather than polling the clock until it comes around
+        time.sleep(TimeUtil.seconds_until_next_interval(30))
+        time.sleep(time_interval)
+        # updating metagraph before run
+        metagraph.sync(subtensor = subtensor)
+        bt.logging.info(f"Metagraph: {metagraph}")
+
+        # clear out cached historical exchange data that is no longer requested
+        data_cache.delete_stale()
 
-            requests = []
-            # see if any files exist, if not then generate a client request (a live prediction)
-            all_files = ValiBkpUtils.get_all_files_in_dir(ValiBkpUtils.get_vali_predictions_dir())
-            # if len(all_files) == 0 or int(config.continuous_data_feed) == 1:
+        requests = []
+        # see if any files exist, if not then generate a client request (a live prediction)
+        all_files = ValiBkpUtils.get_all_files_in_dir(ValiBkpUtils.get_vali_predictions_dir())
+        # if len(all_files) == 0 or int(config.continuous_data_feed) == 1:
 
-            # standardizing getting request
-            requests.append(ValiUtils.generate_standard_request(ClientRequest))
+        # standardizing getting request
+        requests.append(ValiUtils.generate_standard_request(ClientRequest))
 
-            predictions_to_complete = ValiUtils.get_predictions_to_complete()
+        predictions_to_complete = ValiUtils.get_predictions_to_complete()
 
-            bt.logging.info(f"Have [{len(predictions_to_complete)}] requests prepared to have weights set for")
+        bt.logging.info(f"Have [{len(predictions_to_complete)}] requests prepared to have weights set for")
 
-            if len(predictions_to_complete) > 0:
-                # add one request of predictions to complete
-                requests.append(predictions_to_complete[0])
+        if len(predictions_to_complete) > 0:
+            # add one request of predictions to complete
+            requests.append(predictions_to_complete[0])
 
-            # if no requests to fill, randomly send in a training request to help them train
-            # randomize to not have all validators sending in training data requests simultaneously to assist with load
-            if len(requests) == 0:
-                requests.append(ValiUtils.generate_standard_request(TrainingRequest))
+        # if no requests to fill, randomly send in a training request to help them train
+        # randomize to not have all validators sending in training data requests simultaneously to assist with load
+        if len(requests) == 0:
+            requests.append(ValiUtils.generate_standard_request(TrainingRequest))
 
-            bt.logging.info(f"Number of requests being handled [{len(requests)}]")
-            run_time_series_validation(wallet, config, metagraph, requests)
-            time.sleep(60)
\ No newline at end of file
+        bt.logging.info(f"Number of requests being handled [{len(requests)}]")
+        run_time_series_validation(config, wallet, subtensor, dendrite, metagraph, requests)
+        bt.logging.debug(f"exchange data cache hits [{data_cache.hits}] "
+                         f"(empty [{data_cache.empty_hits}]), misses [{data_cache.misses}]")
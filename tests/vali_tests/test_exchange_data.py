@@ -1,16 +1,56 @@
+import asyncio
+import shutil
+import tempfile
 import unittest
 from datetime import datetime, timezone, timedelta
 import random
+from unittest import mock
 
+import aiohttp
+import orjson
+
+from data_generator.cache import FileCache
 from data_generator.data_generator_handler import DataGeneratorHandler
+from data_generator.financial_markets_generator.base_financial_markets_generator.base_financial_markets_generator import \
+    BaseFinancialMarketsGenerator
 from data_generator.financial_markets_generator.binance_data import BinanceData
 from data_generator.financial_markets_generator.bybit_data import ByBitData
 from time_util.time_util import TimeUtil
 from vali_config import ValiConfig
 from vali_objects.dataclasses.client_request import ClientRequest
+from vali_objects.exceptions.incorrect_live_results_count_exception import IncorrectLiveResultsCountException
 from vali_objects.utils.vali_utils import ValiUtils
 
 
+class MockResponse:
+    def __init__(self, status: int, body=None):
+        self.status = status
+        self._body = body
+
+    async def read(self):
+        return orjson.dumps(self._body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class MockSession:
+    # responds to each get w the next item of responses, raising it if it's an exception
+    def __init__(self, responses):
+        self._responses = iter(responses)
+        self.requests = []
+
+    def get(self, url, params=None):
+        self.requests.append(params)
+        response = next(self._responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
 class TestExchangeData(unittest.TestCase):
 
     @staticmethod
@@ -120,6 +160,158 @@ class TestExchangeData(unittest.TestCase):
                 self.assertEqual(exchange_start, datetime(2023, 11, 1, 0, 5, 0, 0))
                 self.assertEqual(exchange_end, datetime(2023, 11, 1, 8, 20, 0, 0))
 
+    def test_retry_backoff(self):
+        for attempt in range(0, 10):
+            delay = BinanceData.get_retry_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(ValiConfig.DATA_REQUEST_BACKOFF_MAX,
+                                            ValiConfig.DATA_REQUEST_BACKOFF_BASE * (2 ** attempt)))
+
+        self.assertFalse(BinanceData.is_last_attempt(0))
+        self.assertTrue(BinanceData.is_last_attempt(ValiConfig.DATA_REQUEST_RETRIES - 1))
+
+        self.assertTrue(BinanceData.is_retryable_status(429))
+        self.assertTrue(BinanceData.is_retryable_status(503))
+        self.assertFalse(BinanceData.is_retryable_status(400))
+        self.assertFalse(BinanceData.is_retryable_status(404))
+
+    def test_kline_params(self):
+        bybit_params = ByBitData().get_kline_params("BTCUSD", 5, None, TimeUtil.minute_in_millis(10), 1000)
+        self.assertNotIn("start", bybit_params)
+        self.assertEqual(bybit_params["end"], TimeUtil.minute_in_millis(5))
+        self.assertEqual(bybit_params["symbol"], "BTCUSDT")
+
+        binance_params = BinanceData().get_kline_params("BTCUSD", 5, 1, 2, 1000)
+        self.assertEqual(binance_params, {"symbol": "BTCUSDT", "interval": "5m",
+                                          "startTime": 1, "endTime": 2, "limit": 1000})
+
+    @mock.patch.object(BaseFinancialMarketsGenerator, "get_retry_delay", return_value=0)
+    def test_request_data_async(self, _):
+        exchange = BinanceData()
+        session = MockSession([aiohttp.ClientConnectionError(), MockResponse(503), MockResponse(200, [[1]])])
+        self.assertEqual(orjson.dumps([[1]]), asyncio.run(exchange.request_data_async(session, "test", {})))
+        self.assertEqual(3, len(session.requests))
+
+        # other 4xx aren't retried
+        session = MockSession([MockResponse(400), MockResponse(200, [[1]])])
+        with self.assertRaises(ConnectionError):
+            asyncio.run(exchange.request_data_async(session, "test", {}))
+        self.assertEqual(1, len(session.requests))
+
+        session = MockSession([MockResponse(429) for _ in range(ValiConfig.DATA_REQUEST_RETRIES)])
+        with self.assertRaises(ConnectionError):
+            asyncio.run(exchange.request_data_async(session, "test", {}))
+        self.assertEqual(ValiConfig.DATA_REQUEST_RETRIES, len(session.requests))
+
+    def test_structure_data_points_async_cached(self):
+        cache_dir = tempfile.mkdtemp() + '/'
+        cache = FileCache(cache_dir)
+        exchange = BinanceData()
+        ts_range = (TimeUtil.minute_in_millis(5), TimeUtil.minute_in_millis(10))
+        rows = [[TimeUtil.minute_in_millis(10), "1", "2", "3", "4", "5"]]
+
+        with mock.patch(f"{BaseFinancialMarketsGenerator.__module__}.data_cache", cache):
+            session = MockSession([MockResponse(200, rows)])
+            data_structure = ValiUtils.get_standardized_ds()
+            asyncio.run(exchange.get_data_and_structure_data_points_async(session, "BTCUSD", 5,
+                                                                          data_structure, ts_range))
+            self.assertEqual(1, len(session.requests))
+            self.assertEqual(ts_range, (session.requests[0]["startTime"], session.requests[0]["endTime"]))
+
+            # closed range is served from the cache w/o another request
+            session = MockSession([])
+            cached_data_structure = ValiUtils.get_standardized_ds()
+            asyncio.run(exchange.get_data_and_structure_data_points_async(session, "BTCUSD", 5,
+                                                                          cached_data_structure, ts_range))
+            self.assertEqual(0, len(session.requests))
+
+        self.assertEqual([[TimeUtil.minute_in_millis(10)], [4.0], [2.0], [3.0], [5.0]], data_structure)
+        self.assertEqual(data_structure, cached_data_structure)
+        shutil.rmtree(cache_dir)
+
+    def test_ranges_async_merged_in_order(self):
+        class RangeSession:
+            # later ranges respond first
+            def get(self, url, params=None):
+                return RangeResponse(params["startTime"])
+
+        class RangeResponse(MockResponse):
+            def __init__(self, start):
+                super().__init__(200, [[start, "1", "2", "3", "4", "5"]])
+                self._start = start
+
+            async def read(self):
+                await asyncio.sleep(0.01 * (3 - self._start))
+                return await super().read()
+
+        class RangeClientSession:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            async def __aenter__(self):
+                return RangeSession()
+
+            async def __aexit__(self, *args):
+                pass
+
+        data_structure = ValiUtils.get_standardized_ds()
+        with mock.patch("aiohttp.ClientSession", RangeClientSession), \
+                mock.patch(f"{BaseFinancialMarketsGenerator.__module__}.data_cache") as data_cache:
+            data_cache.get.return_value = None
+            asyncio.run(DataGeneratorHandler().data_generator_handler_ranges_async(
+                1, {"tf": 5, "trade_pair": "BTCUSD"}, data_structure, [(0, 1), (1, 2), (2, 3)]))
+        self.assertEqual([0, 1, 2], data_structure[0])
+
+    def test_ranges_merged_in_order(self):
+        async def handle_range(_, session, topic_id, expected_length, additional_details, range_ds, ts_range):
+            # later ranges finish first
+            await asyncio.sleep(0.01 * (3 - ts_range[0]))
+            for dp in range_ds:
+                dp.append(ts_range[0])
+
+        data_structure = ValiUtils.get_standardized_ds()
+        with mock.patch.object(DataGeneratorHandler, "data_generator_handler_async", handle_range):
+            asyncio.run(DataGeneratorHandler().data_generator_handler_ranges_async(
+                1, {"tf": 5, "trade_pair": "BTCUSD"}, data_structure, [(0, 1), (1, 2), (2, 3)]))
+        self.assertEqual([[0, 1, 2] for _ in data_structure], data_structure)
+
+    def test_failed_range_cancels_others(self):
+        cancelled = []
+
+        async def handle_range(_, session, topic_id, expected_length, additional_details, range_ds, ts_range):
+            if ts_range[0] == 0:
+                raise IncorrectLiveResultsCountException("test")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(ts_range)
+                raise
+
+        async def run_ranges():
+            with self.assertRaises(IncorrectLiveResultsCountException):
+                await DataGeneratorHandler().data_generator_handler_ranges_async(
+                    1, {"tf": 5, "trade_pair": "BTCUSD"}, ValiUtils.get_standardized_ds(), [(0, 1), (1, 2), (2, 3)])
+            # nothing is left running once the call has raised
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        with mock.patch.object(DataGeneratorHandler, "data_generator_handler_async", handle_range):
+            self.assertEqual([], asyncio.run(run_ranges()))
+        self.assertEqual([(1, 2), (2, 3)], sorted(cancelled))
+
+    def test_failed_exchange_keeps_shared_ds(self):
+        def partial_fetch(_, symbol, tf, data_structure, ts_range):
+            for dp in data_structure:
+                dp.append(ts_range[0])
+            raise ConnectionError("test")
+
+        # ds shared across ranges already holding a previously fetched range
+        data_structure = [[0] for _ in ValiUtils.get_standardized_ds()]
+        with mock.patch.object(BinanceData, "get_data_and_structure_data_points", partial_fetch):
+            with self.assertRaises(Exception):
+                DataGeneratorHandler().data_generator_handler(1, 0, {"tf": 5, "trade_pair": "BTCUSD"},
+                                                              data_structure, (1, 2))
+        self.assertEqual([[0] for _ in data_structure], data_structure)
+
     def test_reduced_wait(self):
         start_dt = TimeUtil.generate_start_timestamp(0) - timedelta(hours=1)
         start_ms, end_ms = TestExchangeData.generate_start_end_ms_using_end(start_dt)
@@ -0,0 +1,71 @@
+# developer: Taoshidev
+# Copyright © 2023 Taoshi Inc
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from data_generator.cache import FileCache
+from data_generator.financial_markets_generator.base_financial_markets_generator.base_financial_markets_generator import \
+    BaseFinancialMarketsGenerator
+from data_generator.financial_markets_generator.binance_data import BinanceData
+from time_util.time_util import TimeUtil
+
+
+class TestFileCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp() + '/'
+        self.cache = FileCache(self.cache_dir)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_make_key(self):
+        self.assertEqual(FileCache.make_key("BinanceData", "BTCUSD", 5, 1, 2),
+                         FileCache.make_key("BinanceData", "BTCUSD", 5, 1, 2))
+        self.assertNotEqual(FileCache.make_key("BinanceData", "BTCUSD", 5, 1, 2),
+                            FileCache.make_key("ByBitData", "BTCUSD", 5, 1, 2))
+
+    def test_set_and_get(self):
+        key = FileCache.make_key("test", 1, 2)
+        self.assertIsNone(self.cache.get(key))
+
+        data = [[1698796800000, "34597.80", "34611.80", "34553.15"]]
+        self.cache.set(key, data)
+        self.assertEqual(data, self.cache.get(key))
+
+    def test_empty_expires(self):
+        key = FileCache.make_key("test", 1, 2)
+        self.cache.set(key, [], TimeUtil.hours_in_millis(1))
+        self.assertEqual([], self.cache.get(key))
+        self.assertEqual(1, self.cache.empty_hits)
+
+        self.cache.set(key, [], -1)
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(1, self.cache.misses)
+
+    @mock.patch(f"{BaseFinancialMarketsGenerator.__module__}.data_cache")
+    def test_only_closed_ranges_cached(self, data_cache):
+        # generators read & write through the fixture cache rather than the shared one
+        data_cache.get.side_effect = self.cache.get
+        data_cache.set.side_effect = self.cache.set
+        exchange = BinanceData()
+        now = TimeUtil.now_in_millis()
+        closed_range = (now - TimeUtil.hours_in_millis(2), now - TimeUtil.hours_in_millis(1))
+        open_range = (now - TimeUtil.hours_in_millis(1), now)
+
+        exchange.set_cached_data("BTCUSD", 5, closed_range, [[1, 2]])
+        exchange.set_cached_data("BTCUSD", 5, open_range, [[3, 4]])
+
+        self.assertEqual([[1, 2]], exchange.get_cached_data("BTCUSD", 5, closed_range))
+        self.assertIsNone(exchange.get_cached_data("BTCUSD", 5, open_range))
+        self.assertTrue(os.path.exists(self.cache_dir
+                                       + FileCache.get_cache_filename(
+                                           exchange.get_data_cache_key("BTCUSD", 5, closed_range))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -43,6 +43,21 @@ class TestScoring(TestBase):
         weighted_rmse = Scoring.score_response(predictions, actual)
         self.assertEqual(weighted_rmse, 0.04999999999999829)
 
+    def test_score_response_batch(self):
+        actual = [x - 0.05 for x in range(0, 100)]
+        predictions = {
+            "miner1": np.array([x for x in range(0, 100)]),
+            "miner2": np.array([x + 1.5 for x in range(0, 100)]),
+            "miner3": np.array([x * 1.01 for x in range(0, 100)])
+        }
+
+        scores = Scoring.score_response_batch(predictions, actual)
+        self.assertEqual(list(predictions.keys()), list(scores.keys()))
+        for miner_uid, miner_preds in predictions.items():
+            self.assertAlmostEqual(Scoring.score_response(miner_preds, actual), scores[miner_uid])
+
+        self.assertEqual({}, Scoring.score_response_batch({}, actual))
+
     def test_score_response_rmse_exs(self):
         predictions1 = [1, 2, 3, 4, 5, 6, 7, 8, 9, 11]
         actual1 = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
@@ -36,6 +36,12 @@ class TestTimeUtil(unittest.TestCase):
     #     generated_timestamps = TimeUtil.generate_range_timestamps(start, 5)
     #     self.assertEqual(TestingData.test_generated_timestamps, generated_timestamps)
 
+    def test_seconds_until_next_interval(self):
+        self.assertEqual(TimeUtil.seconds_until_next_interval(30, datetime(2023, 9, 19, 12, 0, 0)), 1800)
+        self.assertEqual(TimeUtil.seconds_until_next_interval(30, datetime(2023, 9, 19, 12, 29, 30)), 30)
+        self.assertEqual(TimeUtil.seconds_until_next_interval(30, datetime(2023, 9, 19, 12, 45, 0)), 900)
+        self.assertEqual(TimeUtil.seconds_until_next_interval(30, datetime(2023, 9, 19, 23, 59, 59, 500000)), 0.5)
+
     def test_generating_start_end_results(self):
         dt = datetime(2023, 9, 19, 12, 0, 0)
         training_results_start = int(TimeUtil.timestamp_to_millis(dt))
@@ -95,6 +95,19 @@ class TestValiBkpUtils(TestBase):
 
         os.remove(test_valirecords_location)
 
+    def test_write_to_vali_dir_atomic(self):
+        test_dir = ValiConfig.BASE_DIR + '/validation/test_dir/'
+        ValiBkpUtils.make_dir(test_dir)
+        test_cmw = CMWUtil.initialize_cmw()
+        ValiBkpUtils.write_to_vali_dir(test_dir + "test_cmw.json", test_cmw)
+        self.assertEqual(test_cmw, json.loads(ValiBkpUtils.get_vali_file(test_dir + "test_cmw.json")))
+        self.assertFalse(os.path.exists(test_dir + "test_cmw.json" + ValiBkpUtils.get_temp_suffix()))
+
+        # a temp file left behind by an interrupted write isn't picked up
+        open(test_dir + "interrupted.json" + ValiBkpUtils.get_temp_suffix(), 'w').close()
+        self.assertEqual([test_dir + "test_cmw.json"], ValiBkpUtils.get_all_files_in_dir(test_dir))
+        shutil.rmtree(test_dir)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,8 +2,12 @@
 # Copyright © 2023 Taoshi Inc
 
 import json
+import math
 import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
 from tests.vali_tests.samples.testing_data import TestingData
 from tests.vali_tests.base_objects.test_base import TestBase
@@ -26,6 +30,18 @@ class TestValiUtils(TestBase):
         vm = ValiUtils.get_vali_records()
         self.assertIsInstance(vm, CMW)
 
+    def test_get_vali_records_cached(self):
+        vm = ValiUtils.get_vali_records()
+        self.assertIs(vm, ValiUtils.get_vali_records())
+
+        updated_vm = CMWUtil.load_cmw(CMWUtil.dump_cmw(vm))
+        updated_vm.add_client(CMWClient().set_client_uuid("test_client_uuid"))
+        ValiMemoryUtils.set_vali_memory(json.dumps(CMWUtil.dump_cmw(updated_vm)))
+
+        reloaded_vm = ValiUtils.get_vali_records()
+        self.assertIsNot(vm, reloaded_vm)
+        self.assertIsNotNone(reloaded_vm.get_client("test_client_uuid"))
+
     def test_get_vali_bkp_json(self):
         vbkp = ValiUtils.get_vali_bkp_json()
         self.assertIsInstance(vbkp, dict)
@@ -87,6 +103,50 @@ class TestValiUtils(TestBase):
         self.assertTrue(testing_preds_output == TestingData.po)
         os.remove(ValiBkpUtils.get_vali_predictions_dir() + test_pred_filename + ".pickle")
 
+    def test_vali_weights_nan_round_trip(self):
+        weights_file = ValiBkpUtils.get_vali_weights_dir() + ValiBkpUtils.get_vali_weights_file()
+        existing_weights = ValiBkpUtils.get_vali_file(weights_file) if os.path.exists(weights_file) else None
+
+        ValiUtils.set_vali_weights_bkp({"test_miner": float('nan'), "test_miner_2": 0.5})
+        vali_weights = ValiUtils.get_vali_weights_json()
+        self.assertTrue(math.isnan(vali_weights["test_miner"]))
+        self.assertEqual(0.5, vali_weights["test_miner_2"])
+
+        if existing_weights is not None:
+            ValiBkpUtils.write_to_vali_dir(weights_file, json.loads(existing_weights))
+        else:
+            os.remove(weights_file)
+
+    def test_complete_prediction_requests(self):
+        test_dir = tempfile.mkdtemp() + '/'
+        files = {request_uuid: [test_dir + request_uuid + str(i) + ".pickle" for i in range(2)]
+                 for request_uuid in ["test_uuid", "test_failed_uuid", "test_no_cmw_uuid"]}
+        for request_files in files.values():
+            for file in request_files:
+                open(file, 'w').close()
+
+        saved = []
+
+        def save_cmw_results(request_uuid, content):
+            # all prediction files are still on disk when the cmws are written
+            self.assertTrue(all([os.path.exists(file) for request_files in files.values() for file in request_files]))
+            if request_uuid == "test_failed_uuid":
+                raise OSError("test")
+            saved.append(request_uuid)
+
+        with mock.patch.object(ValiUtils, "save_cmw_results", side_effect=save_cmw_results):
+            failed_saves = ValiUtils.complete_prediction_requests([
+                ("test_failed_uuid", CMWUtil.initialize_cmw(), files["test_failed_uuid"]),
+                ("test_uuid", CMWUtil.initialize_cmw(), files["test_uuid"]),
+                ("test_no_cmw_uuid", None, files["test_no_cmw_uuid"])
+            ])
+
+        self.assertEqual(["test_uuid"], saved)
+        self.assertEqual(["test_failed_uuid"], [request_uuid for request_uuid, _ in failed_saves])
+        # weights are already set so files are removed whether or not their cmw was saved
+        self.assertEqual([], os.listdir(test_dir))
+        shutil.rmtree(test_dir)
+
     def test_generate_standard_request(self):
         std_request = ValiUtils.generate_standard_request(ClientRequest)
         self.assertTrue(std_request.stream_type == "BTCUSD-5m")
@@ -58,4 +58,12 @@ class TimeUtil:
     @staticmethod
     def hours_in_millis(hours: int = 24) -> int:
         # standard is 1 day
-        return 60000 * 60 * hours * 1 * 1
\ No newline at end of file
+        return 60000 * 60 * hours * 1 * 1
+
+    @staticmethod
+    def seconds_until_next_interval(interval_minutes: int, now: datetime = None) -> float:
+        # intervals are aligned to the hour, e.g. 30 gives the next :00 or :30
+        if now is None:
+            now = datetime.now()
+        interval_start = now.replace(minute=now.minute - now.minute % interval_minutes, second=0, microsecond=0)
+        return (interval_start + timedelta(minutes=interval_minutes) - now).total_seconds()
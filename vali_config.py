@@ -16,9 +16,17 @@ class ValiConfig:
     PREDICTIONS_MIN = 100
     PREDICTIONS_MAX = 101
     DELETE_STALE_DATA = 180
+    DATA_CACHE_STALE_DAYS = 90
+    DATA_CACHE_EMPTY_TTL_HOURS = 1
 
     STANDARD_TF = 5
 
+    DATA_REQUEST_RETRIES = 5
+    DATA_REQUEST_BACKOFF_BASE = 0.5
+    DATA_REQUEST_BACKOFF_MAX = 10
+    DATA_REQUEST_CONNECT_TIMEOUT = 3
+    DATA_REQUEST_READ_TIMEOUT = 10
+
     BASE_DIR = base_directory = os.path.dirname(os.path.abspath(__file__))
 
     MIN_MAX_RANGES_PERCENTILED = [1.00387751, 1.0046771, 1.00538229, 1.00616374, 1.00664601, 1.0072153, 1.00770294,
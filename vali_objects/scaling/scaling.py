@@ -49,18 +49,13 @@ class Scaling:
 
     @staticmethod
     def scale_data_structure(ds: List[List]) -> (List[float], List[float], List[float], np):
-        scaled_data_structure = []
-        vmins = []
-        vmaxs = []
-        dp_decimal_places = []
-
-        for dp in ds:
-            vmin, vmax, scaled_data_point = Scaling.scale_values(np.array(dp))
-            vmins.append(vmin)
-            vmaxs.append(vmax)
-            dp_decimal_places.append(Scaling.count_decimal_places(dp[0]))
-            scaled_data_structure.append(scaled_data_point)
-        return vmins, vmaxs, dp_decimal_places, np.array(scaled_data_structure)
+        # scale every data point row at once rather than row by row
+        dps = np.array(ds, dtype=np.float64)
+        vmins = dps.min(axis=1)
+        vmaxs = dps.max(axis=1)
+        _, _, scaled_data_structure = Scaling.scale_values(dps, vmin=vmins[:, None], vmax=vmaxs[:, None])
+        dp_decimal_places = [Scaling.count_decimal_places(dp[0]) for dp in ds]
+        return list(vmins), list(vmaxs), dp_decimal_places, scaled_data_structure
 
     @staticmethod
     def unscale_data_structure(avgs: List[float], dp_decimal_places: List[int], sds: np) -> np:
@@ -73,7 +68,6 @@ class Scaling:
     def scale_ds_with_ts(ds: List[List]) -> (List[float], List[float], List[float], np):
         ds_ts = ds[0]
         vmins, vmaxs, dp_decimal_places, scaled_data_structure = Scaling.scale_data_structure(ds[1:])
-        sds_list = scaled_data_structure.tolist()
-        sds_list.insert(0, ds_ts)
-        return vmins, vmaxs, dp_decimal_places, np.array(sds_list)
+        return vmins, vmaxs, dp_decimal_places, np.vstack((np.array(ds_ts, dtype=np.float64),
+                                                           scaled_data_structure))
 
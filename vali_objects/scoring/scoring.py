@@ -42,16 +42,42 @@ class Scoring:
         return correct_directions / (pred_len-1)
 
     @staticmethod
-    def score_response(predictions: np, actual: np) -> float:
+    def calculate_weighted_rmse_batch(predictions: np, actual: np) -> np:
+        # predictions are stacked per miner, one row for each miner
+        predictions = np.array(predictions)
+        actual = np.array(actual)
+
+        k = ValiConfig.RMSE_WEIGHT
+
+        weights = np.exp(-k * np.arange(predictions.shape[1]))
+        weighted_squared_errors = weights * (predictions - actual) ** 2
+        weighted_rmse = np.sqrt(np.sum(weighted_squared_errors, axis=1) / np.sum(weights))
+
+        return weighted_rmse
+
+    @staticmethod
+    def check_prediction_size(predictions: np, actual: np) -> None:
         if len(predictions) != len(actual) or len(predictions) == 0 or len(actual) < 2:
             raise IncorrectPredictionSizeError(f"the number of predictions or the number of responses "
                                                f"needed are incorrect: preds: '{len(predictions)}',"
                                                f" results: '{len(actual)}'")
 
+    @staticmethod
+    def score_response(predictions: np, actual: np) -> float:
+        Scoring.check_prediction_size(predictions, actual)
+
         rmse = Scoring.calculate_weighted_rmse(predictions, actual)
 
         return rmse
 
+    @staticmethod
+    def score_response_batch(predictions: Dict[str, np], actual: np) -> Dict[str, float]:
+        # expects predictions already checked with check_prediction_size
+        if len(predictions) == 0:
+            return {}
+        rmses = Scoring.calculate_weighted_rmse_batch(np.stack(list(predictions.values())), actual)
+        return dict(zip(predictions.keys(), rmses))
+
     @staticmethod
     def scale_scores(scores: Dict[str, float]) -> Dict[str, float]:
         avg_score = sum([score for miner_uid, score in scores.items()]) / len(scores)
@@ -5,6 +5,7 @@ import json
 import os
 import pickle
 from datetime import datetime
+from pathlib import Path
 
 from vali_config import ValiConfig
 from vali_objects.dataclasses.prediction_data_file import PredictionDataFile
@@ -24,6 +25,10 @@ class ValiBkpUtils:
     def get_vali_weights_dir() -> str:
         return ValiConfig.BASE_DIR + '/validation/weights/'
 
+    @staticmethod
+    def get_data_cache_dir() -> str:
+        return ValiConfig.BASE_DIR + '/validation/data_cache/'
+
     @staticmethod
     def get_vali_data_file() -> str:
         return 'valirecords.json'
@@ -57,11 +62,17 @@ class ValiBkpUtils:
     def get_read_type(is_pickle: bool) -> str:
         return 'rb' if is_pickle else 'r'
 
+    @staticmethod
+    def get_temp_suffix() -> str:
+        return '.tmp'
+
     @staticmethod
     def write_to_vali_dir(vali_file: str, vali_data: dict | object, is_pickle: bool = False) -> None:
-        with open(vali_file, ValiBkpUtils.get_write_type(is_pickle)) as f:
+        # written to a temp file and swapped in so readers never see a partially written file
+        temp_file = vali_file + ValiBkpUtils.get_temp_suffix()
+        with open(temp_file, ValiBkpUtils.get_write_type(is_pickle)) as f:
             pickle.dump(vali_data, f) if is_pickle else f.write(json.dumps(vali_data))
-        f.close()
+        os.replace(temp_file, vali_file)
 
     @staticmethod
     def write_vali_file(vali_dir: str, file_name: str, vali_data: dict | object, is_pickle: bool = False) -> None:
@@ -76,25 +87,25 @@ class ValiBkpUtils:
 
     @staticmethod
     def get_all_files_in_dir(vali_dir: str) -> list[str]:
-        all_files = []
-        if os.path.exists(vali_dir):
-            for filename in os.listdir(vali_dir):
-                if os.path.isfile(os.path.join(vali_dir, filename)):
-                    all_files.append(vali_dir + filename)
-        return all_files
+        if not os.path.exists(vali_dir):
+            return []
+        # scandir entries carry the file type so no extra stat per file is needed
+        with os.scandir(vali_dir) as entries:
+            return [vali_dir + entry.name for entry in entries
+                    if entry.is_file() and not entry.name.endswith(ValiBkpUtils.get_temp_suffix())]
 
     @staticmethod
-    def delete_stale_files(vali_dir: str) -> None:
+    def delete_stale_files(vali_dir: str, stale_days: int = ValiConfig.DELETE_STALE_DATA) -> None:
         current_date = datetime.now()
         if os.path.exists(vali_dir):
-            for filename in os.listdir(vali_dir):
-                file_path = os.path.join(vali_dir, filename)
-                if os.path.isfile(file_path):
-                    creation_timestamp = os.path.getctime(file_path)
-                    creation_date = datetime.fromtimestamp(creation_timestamp)
-                    age_in_days = (current_date - creation_date).days
-                    if age_in_days > ValiConfig.DELETE_STALE_DATA:
-                        os.remove(file_path)
+            with os.scandir(vali_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        creation_timestamp = entry.stat().st_ctime
+                        creation_date = datetime.fromtimestamp(creation_timestamp)
+                        age_in_days = (current_date - creation_date).days
+                        if age_in_days > stale_days:
+                            Path(entry.path).unlink(missing_ok=True)
 
 
 
@@ -4,6 +4,7 @@
 import json
 import random
 from inspect import isclass
+from pathlib import Path
 from pickle import UnpicklingError
 from typing import Dict, List, Type, Tuple
 
@@ -26,13 +27,22 @@ from vali_objects.utils.vali_memory_utils import ValiMemoryUtils
 
 
 class ValiUtils:
+    # parsed vali records along w the vali memory they were parsed from
+    _vali_records_cache: Tuple[str, CMW] | None = None
+
     @staticmethod
     def get_vali_records() -> CMW:
+        # only reparse when the vali memory has been changed since the last read
+        vm = ValiMemoryUtils.get_vali_memory()
+        if ValiUtils._vali_records_cache is not None and ValiUtils._vali_records_cache[0] == vm:
+            return ValiUtils._vali_records_cache[1]
         try:
-            return ValiUtils.get_vali_memory_json()
+            vali_records = ValiUtils.get_vali_memory_json()
         except ValiMemoryMissingException:
             ValiUtils.set_memory_with_bkp()
             return ValiUtils.get_vali_records()
+        ValiUtils._vali_records_cache = (vm, vali_records)
+        return vali_records
 
     @staticmethod
     def get_vali_bkp_json() -> Dict:
@@ -56,6 +66,8 @@ class ValiUtils:
         except FileNotFoundError:
             return {}
         else:
+            # stdlib json as json.dumps writes NaN/Infinity (e.g. from non-finite miner predictions)
+            # which orjson rejects, same for the vali bkp & memory
             return json.loads(vweights)
 
     @staticmethod
@@ -105,6 +117,24 @@ class ValiUtils:
                                      ValiBkpUtils.get_response_filename(request_uuid),
                                      content, True)
 
+    @staticmethod
+    def complete_prediction_requests(
+            completed_requests: List[Tuple[str, Dict | None, List[str]]]) -> List[Tuple[str, Exception]]:
+        # every cmw is written before any prediction file is removed. files are removed even if their
+        # cmw couldn't be saved as weights were already set from them, weighing them again would
+        # apply the same results twice
+        failed_saves = []
+        for request_uuid, cmw_results, _ in completed_requests:
+            if cmw_results is not None:
+                try:
+                    ValiUtils.save_cmw_results(request_uuid, cmw_results)
+                except Exception as e:
+                    failed_saves.append((request_uuid, e))
+        for _, _, request_files in completed_requests:
+            for file in request_files:
+                Path(file).unlink(missing_ok=True)
+        return failed_saves
+
     @staticmethod
     def set_vali_memory_and_bkp(vali_records: Dict):
         ValiMemoryUtils.set_vali_memory(json.dumps(vali_records))